@@ -2,6 +2,9 @@
 import asyncio
 import logging
 import glob
+import fnmatch
+import heapq
+import itertools
 from datetime import timedelta
 
 from openwrt_luci_rpc.openwrt_luci_rpc import OpenWrtLuciRPC # pylint: disable=import-error
@@ -30,6 +33,13 @@ from homeassistant.helpers.dispatcher import ( # pylint: disable=import-error
 from .const import (
     DOMAIN,
     SIGNAL_STATE_UPDATED,
+    RPC_PRIORITY_POLL,
+    RPC_MAX_CONCURRENCY,
+    CONF_FIREWALL_TYPES,
+    CONF_INCLUDE,
+    CONF_EXCLUDE,
+    DEFAULT_INCLUDE,
+    DEFAULT_EXCLUDE,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -64,7 +74,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
 
     UPDATE_UNLISTENER = config_entry.add_update_listener(_update_listener)
 
-    _rpc = await hass.async_add_executor_job(LuciRPC, config)
+    _rpc = await hass.async_add_executor_job(LuciRPC, hass, config)
     if not _rpc.success_init:
         return False
 
@@ -102,9 +112,21 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
                 _rpc.cfg[sw_name] = LuciConfig(sw_name, sw_desc, sw_test_key, sw_values, sw_file)
 
 
-    openvpn_result = await hass.async_add_executor_job(_rpc.rpc_call, 'get_all', 'openvpn')
+    # Include patterns only narrow firewall sections; excludes apply to both
+    rule_filter = LuciSectionFilter(
+        config.get(CONF_INCLUDE, DEFAULT_INCLUDE),
+        config.get(CONF_EXCLUDE, DEFAULT_EXCLUDE),
+    )
+    vpn_filter = LuciSectionFilter("", config.get(CONF_EXCLUDE, DEFAULT_EXCLUDE))
+    # Entries created before section types existed keep every type
+    firewall_types = _split_patterns(config.get(CONF_FIREWALL_TYPES, ""))
+
+    openvpn_result = await _rpc.async_rpc_call('get_all', 'openvpn', priority=RPC_PRIORITY_POLL)
     for vpn_entry in openvpn_result:
         _LOGGER.debug("Luci: vpn %s", vpn_entry)
+        if not vpn_filter.accepts(openvpn_result[vpn_entry]):
+            _LOGGER.debug("Luci: vpn %s excluded", vpn_entry)
+            continue
         if openvpn_result[vpn_entry][".name"] in _rpc.vpn:
             vpn = _rpc.vpn[openvpn_result[vpn_entry][".name"]]
         else:
@@ -118,9 +140,13 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
         else:
             vpn.enabled = openvpn_result[vpn_entry]["enabled"] == "1"
 
-    firewall_result = await hass.async_add_executor_job(_rpc.rpc_call, 'get_all', 'firewall')
+    firewall_result = await _rpc.async_rpc_call('get_all', 'firewall', priority=RPC_PRIORITY_POLL)
     for rule_entry in firewall_result:
         _LOGGER.debug("Luci: rule %s: %s", rule_entry, firewall_result[rule_entry])
+        if ((firewall_types and firewall_result[rule_entry].get(".type") not in firewall_types)
+                or not rule_filter.accepts(firewall_result[rule_entry])):
+            _LOGGER.debug("Luci: rule %s excluded", rule_entry)
+            continue
         if firewall_result[rule_entry][".name"] in _rpc.rule:
             rule = _rpc.rule[firewall_result[rule_entry][".name"]]
         else:
@@ -164,6 +190,43 @@ async def async_unload_entry(hass: HomeAssistant, config: ConfigEntry):
 
     return unload_ok
 
+def _split_patterns(value):
+    """Split a comma separated option into a list of patterns."""
+    return [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+
+class LuciSectionFilter():
+    """Decide which UCI sections become entities.
+
+    Patterns are `type:<glob>`, `<option>=<glob>` or `[name:]<glob>`, the
+    latter matching the section id or its `name` option.
+    """
+
+    def __init__(self, include, exclude):
+        self.include = _split_patterns(include)
+        self.exclude = _split_patterns(exclude)
+
+    @staticmethod
+    def _match(pattern, section):
+        if pattern.startswith("type:"):
+            return fnmatch.fnmatchcase(section.get(".type", ""), pattern[5:])
+        if pattern.startswith("name:"):
+            pattern = pattern[5:]
+        elif "=" in pattern:
+            option, value = pattern.split("=", 1)
+            option_value = section.get(option.strip())
+            if option_value is None:
+                return False
+            if not isinstance(option_value, list):
+                option_value = [option_value]
+            return any(fnmatch.fnmatchcase(str(item), value.strip()) for item in option_value)
+        return (fnmatch.fnmatchcase(section.get(".name", ""), pattern)
+                or fnmatch.fnmatchcase(section.get("name", ""), pattern))
+
+    def accepts(self, section):
+        if self.include and not any(self._match(pattern, section) for pattern in self.include):
+            return False
+        return not any(self._match(pattern, section) for pattern in self.exclude)
+
 class LuciConfig():
 
     def __init__(self, name, desc, test_key, values, file):
@@ -210,8 +273,82 @@ class LuciConfigItem():
     def __hash__(self):
         return hash(self.__repr__())
 
+class LuciRPCScheduler():
+    """Priority gate bounding concurrent calls to a router.
+
+    Waiting happens on the event loop; a call only takes an executor
+    thread once it has been granted a slot.
+    """
+
+    def __init__(self, max_concurrency=RPC_MAX_CONCURRENCY):
+        self._queue = []
+        self._seq = itertools.count()
+        self._max_concurrency = max(1, max_concurrency)
+        # Keep one slot free of background polls so writes never wait on them
+        self._max_background = max(1, self._max_concurrency - 1)
+        self._active = 0
+        self._active_background = 0
+        self._reads = {}
+
+    def _dispatch(self):
+        while self._queue and self._active < self._max_concurrency:
+            priority, _, waiter = self._queue[0]
+            if waiter.done():
+                heapq.heappop(self._queue)
+                continue
+            if priority >= RPC_PRIORITY_POLL and self._active_background >= self._max_background:
+                return
+            heapq.heappop(self._queue)
+            self._active += 1
+            if priority >= RPC_PRIORITY_POLL:
+                self._active_background += 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority):
+        """Wait until a call of the given priority may run."""
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            else:
+                waiter.cancel()
+            raise
+
+    def release(self, priority):
+        """Free the slot taken by acquire."""
+        self._active -= 1
+        if priority >= RPC_PRIORITY_POLL:
+            self._active_background -= 1
+        self._dispatch()
+
+    async def _async_run(self, priority, target):
+        await self.acquire(priority)
+        try:
+            return await target()
+        finally:
+            self.release(priority)
+
+    async def async_run(self, priority, target, key=None):
+        """Run the target coroutine function once a slot is granted.
+
+        A background read whose key is already queued or running shares
+        that read instead of queueing again, so an entity keeps its place
+        when poll cycles overlap.
+        """
+        if key is None or priority < RPC_PRIORITY_POLL:
+            return await self._async_run(priority, target)
+        task = self._reads.get(key)
+        if task is None:
+            task = self._reads[key] = asyncio.ensure_future(self._async_run(priority, target))
+            task.add_done_callback(lambda _: self._reads.pop(key, None))
+        return await asyncio.shield(task)
+
 class LuciRPC():
-    def __init__(self, config):
+    def __init__(self, hass, config):
         """Initialize the router."""
         self._rpc = OpenWrtLuciRPC(
             config.get(CONF_HOST),
@@ -220,25 +357,34 @@ class LuciRPC():
             config.get(CONF_SSL),
             config.get(CONF_VERIFY_SSL),
         )
+        self.hass = hass
         self.host = config.get(CONF_HOST)
         self.success_init = self._rpc.token is not None
         if not self.success_init:
             _LOGGER.error("Cannot connect to luci")    
             return
 
+        self.scheduler = LuciRPCScheduler()
         self.cfg = {}
         self.vpn = {}
         self.rule = {}
 
-    def rpc_call(self, method, *args,  **kwargs):
+    async def async_rpc_call(self, method, *args, priority):
+        async def target():
+            return await self.hass.async_add_executor_job(self._rpc_call, method, *args)
+
+        return await self.scheduler.async_run(priority, target, key=(method, *args))
+
+    def _rpc_call(self, method, *args, retry=True):
         rpc_uci_call = Constants.LUCI_RPC_UCI_PATH.format(
             self._rpc.host_api_url), method, *args
         try:
             rpc_result = self._rpc._call_json_rpc(*rpc_uci_call)
         except InvalidLuciTokenError:
+            if not retry:
+                raise
             _LOGGER.info("Refreshing login token")
             self._rpc._refresh_token()
-            return self.rpc_call(method, args)
+            return self._rpc_call(method, *args, retry=False)
 
         return rpc_result
-
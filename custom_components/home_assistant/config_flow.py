@@ -24,6 +24,12 @@ from .const import (
     DEFAULT_VERIFY_SSL,
     DEFAULT_UPDATE_INTERVAL,
     CONN_TIMEOUT,
+    CONF_FIREWALL_TYPES,
+    CONF_INCLUDE,
+    CONF_EXCLUDE,
+    DEFAULT_FIREWALL_TYPES,
+    DEFAULT_INCLUDE,
+    DEFAULT_EXCLUDE,
 )
 _LOGGER = logging.getLogger(__name__)
 
@@ -111,7 +117,8 @@ class LuciConfigFlowHandler(config_entries.ConfigFlow):
                         CONF_PASSWORD: self._password,
                         CONF_SSL: self._ssl,
                         CONF_VERIFY_SSL: self._verify_ssl,
-                        CONF_SCAN_INTERVAL: self._update_interval
+                        CONF_SCAN_INTERVAL: self._update_interval,
+                        CONF_FIREWALL_TYPES: DEFAULT_FIREWALL_TYPES,
                     },
                 )
 
@@ -146,6 +153,9 @@ class LuciConfigOptionsFlowHandler(config_entries.OptionsFlow):
         self._ssl = config_entry.data[CONF_SSL] if CONF_SSL in config_entry.data else DEFAULT_SSL
         self._verify_ssl = config_entry.data[CONF_VERIFY_SSL] if CONF_VERIFY_SSL in config_entry.options else DEFAULT_VERIFY_SSL
         self._update_interval = config_entry.data[CONF_SCAN_INTERVAL] if CONF_SCAN_INTERVAL in config_entry.options else DEFAULT_UPDATE_INTERVAL
+        self._firewall_types = config_entry.data[CONF_FIREWALL_TYPES] if CONF_FIREWALL_TYPES in config_entry.data else ""
+        self._include = config_entry.data[CONF_INCLUDE] if CONF_INCLUDE in config_entry.data else DEFAULT_INCLUDE
+        self._exclude = config_entry.data[CONF_EXCLUDE] if CONF_EXCLUDE in config_entry.data else DEFAULT_EXCLUDE
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
@@ -161,6 +171,9 @@ class LuciConfigOptionsFlowHandler(config_entries.OptionsFlow):
             self._ssl = user_input[CONF_SSL]
             self._verify_ssl = user_input[CONF_VERIFY_SSL]
             self._update_interval = user_input[CONF_SCAN_INTERVAL]
+            self._firewall_types = user_input.get(CONF_FIREWALL_TYPES, "")
+            self._include = user_input.get(CONF_INCLUDE, "")
+            self._exclude = user_input.get(CONF_EXCLUDE, "")
 
         data_schema = {
             vol.Required(CONF_HOST, default=self._host): str,
@@ -169,6 +182,9 @@ class LuciConfigOptionsFlowHandler(config_entries.OptionsFlow):
             vol.Optional(CONF_SSL, default=self._ssl): bool,
             vol.Optional(CONF_VERIFY_SSL, default=self._verify_ssl): bool,
             vol.Optional(CONF_SCAN_INTERVAL, default=self._update_interval): int,
+            vol.Optional(CONF_FIREWALL_TYPES, description={"suggested_value": self._firewall_types}): str,
+            vol.Optional(CONF_INCLUDE, description={"suggested_value": self._include}): str,
+            vol.Optional(CONF_EXCLUDE, description={"suggested_value": self._exclude}): str,
         }
 
         if user_input is not None:
@@ -186,7 +202,10 @@ class LuciConfigOptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_PASSWORD: self._password,
                         CONF_SSL: self._ssl,
                         CONF_VERIFY_SSL: self._verify_ssl,
-                        CONF_SCAN_INTERVAL: self._update_interval
+                        CONF_SCAN_INTERVAL: self._update_interval,
+                        CONF_FIREWALL_TYPES: self._firewall_types,
+                        CONF_INCLUDE: self._include,
+                        CONF_EXCLUDE: self._exclude,
                     },
                 )
 
@@ -13,3 +13,21 @@ DEFAULT_SSL = False
 DEFAULT_VERIFY_SSL = True
 
 CONN_TIMEOUT = 5.0
+
+# RPC scheduling priority classes; lower value runs first
+RPC_PRIORITY_WRITE = 0
+RPC_PRIORITY_VERIFY = 1
+RPC_PRIORITY_POLL = 2
+
+RPC_MAX_CONCURRENCY = 2
+
+CONF_FIREWALL_TYPES = "firewall_types"
+CONF_INCLUDE = "include"
+CONF_EXCLUDE = "exclude"
+
+DEFAULT_FIREWALL_TYPES = "rule,redirect"
+DEFAULT_INCLUDE = ""
+DEFAULT_EXCLUDE = ""
+
+# Delay before the read confirming an optimistic toggle
+RPC_VERIFY_DELAY = 1.0
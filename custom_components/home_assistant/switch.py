@@ -3,7 +3,7 @@ import logging
 
 from openwrt_luci_rpc.exceptions import InvalidLuciLoginError # pylint: disable=import-error
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import ToggleEntity # pylint: disable=import-error
 from homeassistant.const import ( # pylint: disable=import-error
@@ -13,14 +13,23 @@ from homeassistant.helpers.entity import Entity # pylint: disable=import-error
 from homeassistant.helpers.dispatcher import ( # pylint: disable=import-error
     async_dispatcher_connect,
 )
+from homeassistant.helpers.event import async_call_later # pylint: disable=import-error
+from homeassistant.helpers import entity_registry as er # pylint: disable=import-error
 
 from .const import (
     DOMAIN,
     SIGNAL_STATE_UPDATED,
+    RPC_PRIORITY_WRITE,
+    RPC_PRIORITY_VERIFY,
+    RPC_PRIORITY_POLL,
+    RPC_VERIFY_DELAY,
 )
 
 _LOGGER = logging.getLogger(__name__)
 SCAN_INTERVAL = timedelta(seconds=60)
+# Updates and toggles wait on the per-router RPC scheduler, which bounds
+# concurrency without holding executor threads while queued
+PARALLEL_UPDATES = 0
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up switches dynamically."""
@@ -33,6 +42,14 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         entities.append(LuciVPNSwitch(rpc, key))
     for key in rpc.rule:
         entities.append(LuciRuleSwitch(rpc, key))
+
+    # Drop registry entries for sections that are now filtered out
+    unique_ids = {entity.unique_id for entity in entities}
+    registry = er.async_get(hass)
+    for entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if entry.domain == "switch" and entry.unique_id not in unique_ids:
+            _LOGGER.info("Luci: removing %s", entry.entity_id)
+            registry.async_remove(entry.entity_id)
     
     async_add_entities(entities, True)
 
@@ -47,6 +64,9 @@ class LuciEntity(Entity):
         self._rpc = rpc
         self.cfgname = name
         self._is_on = False
+        self._pending_state = None
+        self._write_seq = 0
+        self._verify_unsub = None
 
         self.host = self._rpc.host
 
@@ -55,6 +75,7 @@ class LuciEntity(Entity):
         async_dispatcher_connect(
             self.hass, SIGNAL_STATE_UPDATED, self.async_schedule_update_ha_state
         )
+        self.async_on_remove(self._async_cancel_verify)
 
     @property
     def unique_id(self):
@@ -74,6 +95,56 @@ class LuciEntity(Entity):
     def is_on(self):
         """Return true if switch is on."""
         return self._is_on
+
+    @callback
+    def _async_set_optimistic(self, is_on):
+        """Show an accepted write right away and confirm it later."""
+        self._write_seq += 1
+        self._pending_state = is_on
+        self._is_on = is_on
+        self.async_write_ha_state()
+        self._async_cancel_verify()
+        self._verify_unsub = async_call_later(self.hass, RPC_VERIFY_DELAY, self._async_verify)
+
+    @callback
+    def _async_cancel_verify(self):
+        if self._verify_unsub:
+            self._verify_unsub()
+            self._verify_unsub = None
+
+    async def _async_verify(self, _now):
+        # Called directly rather than via async_update_ha_state, which would
+        # skip the read while a poll is running. If the read cannot tell, the
+        # toggle stays pending and the next poll confirms it.
+        self._verify_unsub = None
+        if self._pending_state is None:
+            return
+        await self.async_update()
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        """Update the state from the router, confirming any pending toggle."""
+        if self._verify_unsub is not None:
+            # Leave the pending toggle to the deferred verification
+            return
+        write_seq = self._write_seq
+        pending_state = self._pending_state
+        priority = RPC_PRIORITY_POLL if pending_state is None else RPC_PRIORITY_VERIFY
+        is_on = await self._async_read_state(priority)
+        if write_seq != self._write_seq:
+            # A write was accepted while reading; this result predates it
+            return
+        if is_on is None:
+            if pending_state is None:
+                self._attr_available = False
+            # Otherwise keep the pending toggle for the next read to confirm
+            return
+        self._attr_available = True
+        if pending_state is not None and is_on != pending_state:
+            _LOGGER.error("Luci: %s is still %s on the router, reverting",
+                self.name, "on" if is_on else "off")
+        self._pending_state = None
+        self._is_on = is_on
     
 class LuciConfigSwitch(LuciEntity, ToggleEntity):
     """Representation of a Luci switch."""
@@ -98,42 +169,40 @@ class LuciConfigSwitch(LuciEntity, ToggleEntity):
         "file": self._cfg.file
         }
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        #await self.instrument.turn_on()
         _LOGGER.debug("LuciConfig: %s turned on", self._cfg.name)
 
         for key in self._cfg.values:
             params = key.split(".")
             params.append(self._cfg.values[key])
-            self._rpc.rpc_call("set", *params)
-        self._rpc.rpc_call("apply")
+            await self._rpc.async_rpc_call("set", *params, priority=RPC_PRIORITY_WRITE)
+        await self._rpc.async_rpc_call("apply", priority=RPC_PRIORITY_WRITE)
 
-        self.schedule_update_ha_state()
+        self._async_set_optimistic(True)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off. NOOP"""
 
-    def update(self):
-        """Update vesync device."""
-        self._is_on = False
+    async def _async_read_state(self, priority):
+        """Return the router state, or None when it cannot be read."""
         for key in self._cfg.test_key:
             if (self._cfg.values[key] is None):
                 _LOGGER.error("LuciConfig: test key '%s' is not in uci values", key)
-                return
+                return False
             params = key.split(".")
             try:
-                cfg_value = self._rpc.rpc_call('get', *params)
-            except:
-                return
+                cfg_value = await self._rpc.async_rpc_call('get', *params, priority=priority)
+            except Exception:
+                return None
             if (cfg_value is None):
                 _LOGGER.error("LuciConfig: cannot get current value for %s", key)
-                return
+                return None
             else:
                 _LOGGER.debug("Luci get %s returned: %s", key, cfg_value) 
                 if (cfg_value != self._cfg.values[key]):
-                    return
-        self._is_on = True
+                    return False
+        return True
 
 class LuciVPNSwitch(LuciEntity, ToggleEntity):
     """Representation of a Luci switch."""
@@ -152,39 +221,36 @@ class LuciVPNSwitch(LuciEntity, ToggleEntity):
         """Return the icon."""
         return "mdi:vpn"
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        #await self.instrument.turn_on()
         _LOGGER.debug("Luci: %s turned on", self._vpn.name)
 
-        self._rpc.rpc_call("set", "openvpn", self._vpn.id, "enabled", "1")
-        self._rpc.rpc_call("commit", "openvpn")
+        await self._rpc.async_rpc_call("set", "openvpn", self._vpn.id, "enabled", "1", priority=RPC_PRIORITY_WRITE)
+        await self._rpc.async_rpc_call("commit", "openvpn", priority=RPC_PRIORITY_WRITE)
 
-        self.schedule_update_ha_state()
+        self._async_set_optimistic(True)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        #await self.instrument.turn_off()
         _LOGGER.debug("Luci: %s turned off", self._vpn.name)
 
-        self._rpc.rpc_call("set", "openvpn", self._vpn.id, "enabled", "0")
-        self._rpc.rpc_call("commit", "openvpn")
+        await self._rpc.async_rpc_call("set", "openvpn", self._vpn.id, "enabled", "0", priority=RPC_PRIORITY_WRITE)
+        await self._rpc.async_rpc_call("commit", "openvpn", priority=RPC_PRIORITY_WRITE)
 
-        self.schedule_update_ha_state()
+        self._async_set_optimistic(False)
 
-    def update(self):
-        """Update vesync device."""
-        self._is_on = False
+    async def _async_read_state(self, priority):
         try:
-            cfg_value = self._rpc.rpc_call('get', "openvpn", self._vpn.id, "enabled")
+            cfg_value = await self._rpc.async_rpc_call('get', "openvpn", self._vpn.id, "enabled", priority=priority)
         except InvalidLuciLoginError:
             # Assume this means the "enabled" key is not present; Assume it means True
             cfg_value = True
-        except:
-            return
+        except Exception:
+            return None
         if (cfg_value is not None):
             _LOGGER.debug("Luci VPN get %s returned: %s", self._vpn.name, cfg_value) 
-            self._is_on = (cfg_value == "1")
+            return (cfg_value == "1")
+        return None
         
 class LuciRuleSwitch(LuciEntity, ToggleEntity):
     """Representation of a Luci switch."""
@@ -203,38 +269,35 @@ class LuciRuleSwitch(LuciEntity, ToggleEntity):
         """Return the icon."""
         return "mdi:fire"
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        #await self.instrument.turn_on()
         _LOGGER.debug("Luci: %s turned on", self._rule.name)
 
-        self._rpc.rpc_call("set", "firewall", self._rule.id, "enabled", "1")
-        self._rpc.rpc_call("commit", "firewall")
+        await self._rpc.async_rpc_call("set", "firewall", self._rule.id, "enabled", "1", priority=RPC_PRIORITY_WRITE)
+        await self._rpc.async_rpc_call("commit", "firewall", priority=RPC_PRIORITY_WRITE)
 
-        self.schedule_update_ha_state()
+        self._async_set_optimistic(True)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        #await self.instrument.turn_off()
         _LOGGER.debug("Luci: %s turned off", self._rule.name)
 
-        self._rpc.rpc_call("set", "firewall", self._rule.id, "enabled", "0")
-        self._rpc.rpc_call("commit", "firewall")
+        await self._rpc.async_rpc_call("set", "firewall", self._rule.id, "enabled", "0", priority=RPC_PRIORITY_WRITE)
+        await self._rpc.async_rpc_call("commit", "firewall", priority=RPC_PRIORITY_WRITE)
 
-        self.schedule_update_ha_state()
+        self._async_set_optimistic(False)
 
-    def update(self):
-        """Update vesync device."""
-        self._is_on = False
+    async def _async_read_state(self, priority):
         try:
-            cfg_value = self._rpc.rpc_call('get', "firewall", self._rule.id, "enabled")
+            cfg_value = await self._rpc.async_rpc_call('get', "firewall", self._rule.id, "enabled", priority=priority)
         except InvalidLuciLoginError:
             # Assume this means the "enabled" key is not present; Assume it means True
             cfg_value = True
-        except:
+        except Exception:
             _LOGGER.error("Cannot update rule %s", self._rule.id) 
-            return
+            return None
         if (cfg_value is not None):
             _LOGGER.debug("Luci Rule get %s returned: %s", self._rule.name, cfg_value) 
-            self._is_on = (cfg_value != "0")
+            return (cfg_value != "0")
+        return None
         
\ No newline at end of file
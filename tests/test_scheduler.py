@@ -0,0 +1,65 @@
+"""Tests for the luci_config RPC scheduler."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("openwrt_luci_rpc")
+
+from custom_components.home_assistant import LuciRPCScheduler # noqa: E402
+from custom_components.home_assistant.const import ( # noqa: E402
+    RPC_PRIORITY_POLL,
+    RPC_PRIORITY_WRITE,
+)
+
+ENTITIES = 300
+RPC_TIME = 0.001
+
+
+def _read(served, entity):
+    async def target():
+        await asyncio.sleep(RPC_TIME)
+        served.append(entity)
+    return target
+
+
+def test_overlapping_poll_cycles_reach_every_entity():
+    """Cycles shorter than a full pass still poll every entity once."""
+
+    async def run():
+        scheduler = LuciRPCScheduler(max_concurrency=2)
+        served = []
+        tasks = []
+        for _ in range(5):
+            tasks += [
+                asyncio.ensure_future(scheduler.async_run(RPC_PRIORITY_POLL, _read(served, entity), key=entity))
+                for entity in range(ENTITIES)
+            ]
+            # A full pass takes at least ENTITIES * RPC_TIME
+            await asyncio.sleep(ENTITIES * RPC_TIME / 10)
+        await asyncio.gather(*tasks)
+        return served
+
+    served = asyncio.run(run())
+    assert set(served) == set(range(ENTITIES))
+    # Queued duplicates share one read instead of piling up behind it
+    assert len(served) < 2 * ENTITIES
+
+
+def test_write_skips_queued_polls():
+    """A write runs before background polls queued ahead of it."""
+
+    async def run():
+        scheduler = LuciRPCScheduler(max_concurrency=2)
+        served = []
+        polls = [
+            asyncio.ensure_future(scheduler.async_run(RPC_PRIORITY_POLL, _read(served, entity), key=entity))
+            for entity in range(ENTITIES)
+        ]
+        await asyncio.sleep(0)
+        await scheduler.async_run(RPC_PRIORITY_WRITE, _read(served, "write"))
+        pending = len(served)
+        await asyncio.gather(*polls)
+        return pending
+
+    assert asyncio.run(run()) <= 2